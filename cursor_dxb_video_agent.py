@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 # =============================================================================
 # Cursor-Optimized DXB Video Editing Lead Agent — single file, stdlib only
-# Run: python cursor_dxb_video_agent.py
+# Run: python cursor_dxb_video_agent.py   (Python 3.10+)
 #
 # CURSOR_RULES (for the AI editor):
 # - Keep this project SINGLE FILE and STDLIB-ONLY (no external deps, no APIs, no SMTP).
@@ -13,10 +13,9 @@
 # =============================================================================
 
 from __future__ import annotations
-import csv, os, re, uuid, textwrap
+import csv, functools, itertools, operator, os, re, sys, textwrap, time, zipfile
 from dataclasses import dataclass
-from typing import List, Dict, Optional, Tuple
-from datetime import datetime
+from typing import Callable, List, Dict, Optional, Tuple
 
 # =============================================================================
 # REGION: EDITABLE ZONE — CONFIG
@@ -37,6 +36,8 @@ CONFIG: Dict[str, object] = {
     # Extras
     "AUTO_GENERATE_LANDING": True,
     "RUN_SMOKE_TEST": False,  # set True to generate a tiny test pass file
+    # Write per-lead messages into one outreach.zip instead of loose folders
+    "PACK_AS_ZIP": False,
     # Output directory
     "OUTPUT_DIR": "output",
 }
@@ -71,6 +72,7 @@ OUTPUT_DIR = str(CONFIG.get("OUTPUT_DIR", "output"))
 EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
 PHONE_RE = re.compile(r"\+?\d[\d\s-]{6,}\d")
 IG_RE    = re.compile(r"^@?[A-Za-z0-9_.]{2,30}$")
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
 
 NICHE_WEIGHTS: Dict[str, int] = {
     "real estate": 3, "restaurant": 2, "gym": 2, "clinic": 3,
@@ -80,7 +82,7 @@ PLATFORM_WEIGHTS: Dict[str, int] = {
     "email": 3, "whatsapp": 3, "instagram": 2, "linkedin": 2,
 }
 
-@dataclass
+@dataclass(slots=True)
 class Lead:
     id: str
     name: str
@@ -98,8 +100,20 @@ class Lead:
 # REGION: SMALL UTILS
 # =============================================================================
 
+_lead_ids = itertools.count(1)
+
+
+def next_lead_id() -> str:
+    return f"L{next(_lead_ids):08d}"
+
+
 def now_str() -> str:
-    return datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
+    return time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime())
+
+
+@functools.lru_cache(maxsize=4096)
+def _slugify(name: str) -> str:
+    return _SLUG_RE.sub("-", (name or "lead").lower())[:40]
 
 
 def ensure_out_dir(path: str = OUTPUT_DIR) -> None:
@@ -132,39 +146,80 @@ def dedupe(leads: List[Lead]) -> List[Lead]:
 # REGION: QUALIFICATION
 # =============================================================================
 
+_OBSERVATIONS: Tuple[Tuple[str, str], ...] = (
+    ("real estate", "Dubai property reels are exploding — agents winning use 4–7s hooks and subtitles"),
+    ("restaurant",  "Food reels in {city} perform best with overhead shots + on-screen prices"),
+    ("gym",         "Fitness content with timer overlays and form tips drives saves in {city}"),
+    ("clinic",      "Before/after edits with compliant captions convert for clinics in {city}"),
+    ("auto",        "Showroom walkarounds with spec popups perform well in {city}"),
+)
+_OBSERVATION_DEFAULT = "Short-form clips with captions and on-screen text are outperforming in {city}"
+
+
+@functools.lru_cache(maxsize=None)
 def personalize_observation(niche: str, city: str) -> str:
-    obs = {
-        "real estate": f"Dubai property reels are exploding — agents winning use 4–7s hooks and subtitles",
-        "restaurant":  f"Food reels in {city} perform best with overhead shots + on-screen prices",
-        "gym":         f"Fitness content with timer overlays and form tips drives saves in {city}",
-        "clinic":      f"Before/after edits with compliant captions convert for clinics in {city}",
-        "auto":        f"Showroom walkarounds with spec popups perform well in {city}",
-    }
-    return obs.get(niche, f"Short-form clips with captions and on-screen text are outperforming in {city}")
+    for key, fmt in _OBSERVATIONS:
+        if key == niche:
+            return fmt.format(city=city)
+    return _OBSERVATION_DEFAULT.format(city=city)
 
 
-def qualify(lead: Lead, city: str) -> Lead:
-    score = 0
+def _has_linkedin_url(contact: str) -> bool:
+    return "linkedin.com" in contact
+
+
+# platform -> (validator, note, bonus); only the lead's own platform is checked
+_PLATFORM_VALIDATORS: Dict[str, Tuple[Callable[[str], object], str, int]] = {
+    "email":     (EMAIL_RE.search, "valid_email", 2),
+    "whatsapp":  (PHONE_RE.search, "valid_phone", 2),
+    "instagram": (IG_RE.search, "handle_ok", 1),
+    "linkedin":  (_has_linkedin_url, "linkedin_url", 1),
+}
+
+VISUAL_NICHES = frozenset({"real estate", "restaurant", "clinic", "auto", "salon", "gym", "cafe"})
+
+# Niche weight with the visual-niche bonus folded in (unknown niches score 1).
+_NICHE_BASE: Dict[str, int] = {
+    niche: NICHE_WEIGHTS.get(niche, 1) + (1 if niche in VISUAL_NICHES else 0)
+    for niche in NICHE_WEIGHTS.keys() | VISUAL_NICHES
+}
+
+
+def contact_ok(lead: Lead) -> bool:
+    v = _PLATFORM_VALIDATORS.get(lead.platform)
+    return bool(v and v[0](lead.contact))
+
+
+def score_parts(niche: str, platform: str, valid_contact: bool) -> Tuple[int, str]:
+    score = _NICHE_BASE.get(niche, 1) + PLATFORM_WEIGHTS.get(platform, 1)
     notes: List[str] = []
 
-    score += NICHE_WEIGHTS.get(lead.niche, 1)
-    score += PLATFORM_WEIGHTS.get(lead.platform, 1)
+    if valid_contact:
+        _, note, bonus = _PLATFORM_VALIDATORS[platform]
+        score += bonus; notes.append(note)
+
+    if niche in VISUAL_NICHES:
+        notes.append("visual_niche")
 
-    if lead.platform == "email" and EMAIL_RE.search(lead.contact):
-        score += 2; notes.append("valid_email")
-    if lead.platform == "whatsapp" and PHONE_RE.search(lead.contact):
-        score += 2; notes.append("valid_phone")
-    if lead.platform == "instagram" and IG_RE.search(lead.contact):
-        score += 1; notes.append("handle_ok")
-    if lead.platform == "linkedin" and "linkedin.com" in lead.contact:
-        score += 1; notes.append("linkedin_url")
+    return score, ",".join(notes)
 
-    if lead.niche in {"real estate", "restaurant", "clinic", "auto", "salon", "gym", "cafe"}:
-        score += 1; notes.append("visual_niche")
 
-    lead.score = score
-    lead.notes = ",".join(notes)
+def qualify(lead: Lead, city: str) -> Lead:
+    lead.score, lead.notes = score_parts(lead.niche, lead.platform, contact_ok(lead))
     return lead
+
+
+def qualify_all(leads: List[Lead], city: str) -> List[Lead]:
+    # The score depends only on (niche, platform, contact_ok), a tiny domain,
+    # so each combination is scored once and reused across the batch.
+    scored: Dict[Tuple[str, str, bool], Tuple[int, str]] = {}
+    for lead in leads:
+        key = (lead.niche, lead.platform, contact_ok(lead))
+        parts = scored.get(key)
+        if parts is None:
+            parts = scored[key] = score_parts(*key)
+        lead.score, lead.notes = parts
+    return leads
 # =============================================================================
 # END REGION
 # =============================================================================
@@ -174,25 +229,15 @@ def qualify(lead: Lead, city: str) -> Lead:
 # REGION: MESSAGING TEMPLATES
 # =============================================================================
 
-def subject_lines(name: str, niche: str) -> List[str]:
-    return [
-        f"Fast video edits for {name}",
-        f"Reels that book more {niche} clients",
-        "2-day turnaround on high-retention edits",
-        "Quick idea: 5 hooks for your next reel",
-        "Dubai-ready content in 48h",
-    ]
+# Templates are dedented once at import. {city}, {brand} and {offer_text} are
+# baked in once per run by specialize_templates(); {name}, {first_name},
+# {niche} and {obs} are filled per lead.
+_EMAIL_TMPL = textwrap.dedent("""
+    Subject: Fast video edits for {name}
 
+    Hi {first_name},
 
-def email_template(lead: Lead, city: str, brand: str, offer_text: str) -> str:
-    obs = personalize_observation(lead.niche, city)
-    subs = subject_lines(lead.name, lead.niche)
-    return textwrap.dedent(f"""
-    Subject: {subs[0]}
-
-    Hi {lead.name.split()[0] if lead.name else 'there'},
-
-    {obs}. I help {lead.niche} brands turn raw footage into scroll-stopping Reels/Shorts.
+    {obs}. I help {niche} brands turn raw footage into scroll-stopping Reels/Shorts.
 
     Offer: {offer_text}
 
@@ -206,30 +251,67 @@ def email_template(lead: Lead, city: str, brand: str, offer_text: str) -> str:
     — {brand}
     """).strip()
 
+_WHATSAPP_TMPL = (
+    "Hey {first_name}! {obs}. "
+    "I do fast video edits (Reels/TikTok/Shorts). {offer_text} — "
+    "Want a free 20s sample? — {brand}"
+)
+
+_INSTAGRAM_TMPL = (
+    "Love your page, {name}! I edit high-retention Reels for {niche} in {city}. "
+    "{offer_text} If I cut a 20s sample from your footage (free), can I DM it here? — {brand}"
+)
+
+_LINKEDIN_TMPL = (
+    "Hi {name}, I help {niche} teams in {city} turn raw clips into Reels/Shorts. "
+    "{offer_text} Open to a free 20s sample? — {brand}"
+)
+
+LINKEDIN_FOLLOWUP = "Quick follow-up: happy to send 3 tailored hook ideas for your next video (free). Interested?"
+
+TEMPLATES: Dict[str, str] = {
+    "email": _EMAIL_TMPL,
+    "whatsapp": _WHATSAPP_TMPL,
+    "instagram": _INSTAGRAM_TMPL,
+    "linkedin": _LINKEDIN_TMPL,
+}
 
-def whatsapp_template(lead: Lead, city: str, brand: str, offer_text: str) -> str:
-    obs = personalize_observation(lead.niche, city)
-    return (
-        f"Hey {lead.name.split()[0] if lead.name else ''}! {obs}. "
-        f"I do fast video edits (Reels/TikTok/Shorts). {offer_text} — "
-        f"Want a free 20s sample? — {brand}"
-    ).strip()
 
+def _format_literal(s: str) -> str:
+    return s.replace("{", "{{").replace("}", "}}")
 
-def instagram_template(lead: Lead, city: str, brand: str, offer_text: str) -> str:
-    return (
-        f"Love your page, {lead.name}! I edit high-retention Reels for {lead.niche} in {city}. "
-        f"{offer_text} If I cut a 20s sample from your footage (free), can I DM it here? — {brand}"
-    )
+
+_FIXED_FIELD_RE = re.compile(r"\{(city|brand|offer_text)\}")
+
+
+def specialize_templates(city: str, brand: str, offer_text: str) -> Dict[str, str]:
+    # Single pass, so a baked-in value is never rescanned for placeholders.
+    fixed = {"city": _format_literal(city), "brand": _format_literal(brand), "offer_text": _format_literal(offer_text)}
+    return {
+        platform: _FIXED_FIELD_RE.sub(lambda m: fixed[m.group(1)], tmpl)
+        for platform, tmpl in TEMPLATES.items()
+    }
 
 
-def linkedin_template(lead: Lead, city: str, brand: str, offer_text: str) -> Tuple[str, str]:
-    note = (
-        f"Hi {lead.name}, I help {lead.niche} teams in {city} turn raw clips into Reels/Shorts. "
-        f"{offer_text} Open to a free 20s sample? — {brand}"
+def email_template(lead: Lead, first_name: str, obs: str, tmpl: str) -> str:
+    return tmpl.format(
+        name=lead.name,
+        first_name=first_name or "there",
+        niche=lead.niche,
+        obs=obs,
     )
-    followup = "Quick follow-up: happy to send 3 tailored hook ideas for your next video (free). Interested?"
-    return note, followup
+
+
+def whatsapp_template(lead: Lead, first_name: str, obs: str, tmpl: str) -> str:
+    return tmpl.format(first_name=first_name, obs=obs).strip()
+
+
+def instagram_template(lead: Lead, tmpl: str) -> str:
+    return tmpl.format(name=lead.name, niche=lead.niche)
+
+
+def linkedin_template(lead: Lead, tmpl: str) -> Tuple[str, str]:
+    return tmpl.format(name=lead.name, niche=lead.niche), LINKEDIN_FOLLOWUP
 # =============================================================================
 # END REGION
 # =============================================================================
@@ -241,16 +323,25 @@ def linkedin_template(lead: Lead, city: str, brand: str, offer_text: str) -> Tup
 
 def read_csv_leads(path: str) -> List[Lead]:
     leads: List[Lead] = []
-    with open(path, newline="", encoding="utf-8") as f:
-        r = csv.DictReader(f)
+    with open(path, newline="", encoding="utf-8", buffering=1 << 20) as f:
+        r = csv.reader(f)
+        header = [h.strip().lower() for h in next(r, [])]
+        if not {"name", "contact", "platform"} <= set(header):
+            return []
+        i_name, i_contact, i_platform = (header.index(k) for k in ("name", "contact", "platform"))
+        i_niche = header.index("niche") if "niche" in header else None
+        width = max(i_name, i_contact, i_platform) + 1
         for row in r:
-            name = (row.get("Name") or row.get("name") or "").strip()
-            niche = (row.get("Niche") or row.get("niche") or "").strip().lower()
-            contact = (row.get("Contact") or row.get("contact") or "").strip()
-            platform = (row.get("Platform") or row.get("platform") or "").strip().lower()
+            if len(row) < width:
+                continue
+            name = row[i_name].strip()
+            niche = row[i_niche] if i_niche is not None and i_niche < len(row) else ""
+            niche = sys.intern(niche.strip().lower())
+            contact = row[i_contact].strip()
+            platform = sys.intern(row[i_platform].strip().lower())
             if not name or not contact or not platform:
                 continue
-            leads.append(Lead(str(uuid.uuid4()), name, niche, contact, platform))
+            leads.append(Lead(next_lead_id(), name, niche, contact, platform))
     return dedupe(leads)
 
 
@@ -258,57 +349,68 @@ def embedded_leads() -> List[Lead]:
     leads: List[Lead] = []
     for row in EMBEDDED_LEADS:
         name = (row.get("Name") or "").strip()
-        niche = (row.get("Niche") or "").strip().lower()
+        niche = sys.intern((row.get("Niche") or "").strip().lower())
         contact = (row.get("Contact") or "").strip()
-        platform = (row.get("Platform") or "").strip().lower()
+        platform = sys.intern((row.get("Platform") or "").strip().lower())
         if not name or not contact or not platform:
             continue
-        leads.append(Lead(str(uuid.uuid4()), name, niche, contact, platform))
+        leads.append(Lead(next_lead_id(), name, niche, contact, platform))
     return dedupe(leads)
 
 
 def export_scored_csv(leads: List[Lead], path: str) -> None:
-    with open(path, "w", newline="", encoding="utf-8") as f:
+    # Expects leads pre-sorted by score (see run_agent).
+    with open(path, "w", newline="", encoding="utf-8", buffering=1 << 20) as f:
         w = csv.writer(f)
         w.writerow(["ID", "Name", "Niche", "Contact", "Platform", "Score", "Notes"])
-        for l in sorted(leads, key=lambda x: x.score, reverse=True):
-            w.writerow([l.id, l.name, l.niche, l.contact, l.platform, l.score, l.notes])
+        w.writerows((l.id, l.name, l.niche, l.contact, l.platform, l.score, l.notes) for l in leads)
 
 
 def export_outreach_pack(leads: List[Lead], city: str, brand: str, offer_text: str) -> None:
+    # Expects leads pre-sorted by score (see run_agent).
     ensure_out_dir()
-    master = []
-    for l in sorted(leads, key=lambda x: x.score, reverse=True):
+    # Keyed by (slug, filename) so leads sharing a slug overwrite, as loose files would.
+    entries: Dict[Tuple[str, str], str] = {}
+    parts: List[str] = [f"Generated: {now_str()}\nCity: {city}\nBrand: {brand}\n\n"]
+    tmpls = specialize_templates(city, brand, offer_text)
+    for l in leads:
+        first_name = l.name.partition(" ")[0]
         if l.platform == "email":
-            msg = email_template(l, city, brand, offer_text)
+            msg = email_template(l, first_name, personalize_observation(l.niche, city), tmpls["email"])
         elif l.platform == "whatsapp":
-            msg = whatsapp_template(l, city, brand, offer_text)
+            msg = whatsapp_template(l, first_name, personalize_observation(l.niche, city), tmpls["whatsapp"])
         elif l.platform == "instagram":
-            msg = instagram_template(l, city, brand, offer_text)
+            msg = instagram_template(l, tmpls["instagram"])
         elif l.platform == "linkedin":
-            note, follow = linkedin_template(l, city, brand, offer_text)
+            note, follow = linkedin_template(l, tmpls["linkedin"])
             msg = f"Connection Note:\n{note}\n\nFollow-up:\n{follow}"
         else:
             continue
 
-        slug = re.sub(r"[^a-z0-9]+", "-", (l.name or "lead").lower())[:40]
-        lead_dir = os.path.join(OUTPUT_DIR, slug)
-        os.makedirs(lead_dir, exist_ok=True)
-        with open(os.path.join(lead_dir, f"{l.platform}.txt"), "w", encoding="utf-8") as f:
-            f.write(msg + "\n")
+        entries[(_slugify(l.name), f"{l.platform}.txt")] = msg + "\n"
 
-        master.append({"name": l.name, "platform": l.platform, "contact": l.contact, "message": msg})
+        parts.append("=" * 60 + "\n")
+        parts.append(f"{l.name} — {l.platform} — {l.contact}\n\n")
+        parts.append(msg + "\n\n")
 
-    with open(os.path.join(OUTPUT_DIR, "outreach_pack.txt"), "w", encoding="utf-8") as f:
-        f.write(f"Generated: {now_str()}\nCity: {city}\nBrand: {brand}\n\n")
-        for item in master:
-            f.write("=" * 60 + "\n")
-            f.write(f"{item['name']} — {item['platform']} — {item['contact']}\n\n")
-            f.write(item["message"] + "\n\n")
+    if bool(CONFIG.get("PACK_AS_ZIP", False)):
+        with zipfile.ZipFile(os.path.join(OUTPUT_DIR, "outreach.zip"), "w", zipfile.ZIP_STORED) as z:
+            for (slug, fname), text in entries.items():
+                z.writestr(f"{slug}/{fname}", text)
+    else:
+        for slug in {slug for slug, _ in entries}:
+            os.makedirs(os.path.join(OUTPUT_DIR, slug), exist_ok=True)
+        for (slug, fname), text in entries.items():
+            with open(os.path.join(OUTPUT_DIR, slug, fname), "w", encoding="utf-8") as f:
+                f.write(text)
 
+    with open(os.path.join(OUTPUT_DIR, "outreach_pack.txt"), "w", encoding="utf-8", buffering=1 << 20) as f:
+        f.write("".join(parts))
 
-def write_landing_html(brand: str, city: str, offer_text: str, path: str = "landing.html") -> None:
-    html = f"""
+
+@functools.lru_cache(maxsize=8)
+def _render_landing(brand: str, city: str, offer_text: str) -> str:
+    return f"""
 <!doctype html>
 <html lang="en"><head>
 <meta charset="utf-8" />
@@ -359,8 +461,11 @@ def write_landing_html(brand: str, city: str, offer_text: str, path: str = "land
 </div>
 </body></html>
 """.strip()
+
+
+def write_landing_html(brand: str, city: str, offer_text: str, path: str = "landing.html") -> None:
     with open(path, "w", encoding="utf-8") as f:
-        f.write(html)
+        f.write(_render_landing(brand, city, offer_text))
 # =============================================================================
 # END REGION
 # =============================================================================
@@ -377,16 +482,12 @@ def load_leads() -> List[Lead]:
 
 
 def apply_filters(leads: List[Lead]) -> List[Lead]:
-    niches = [s.lower() for s in (CONFIG.get("FILTER_NICHES") or [])]
-    platforms = [s.lower() for s in (CONFIG.get("FILTER_PLATFORMS") or [])]
-    out: List[Lead] = []
-    for l in leads:
-        if niches and l.niche not in niches:
-            continue
-        if platforms and l.platform not in platforms:
-            continue
-        out.append(l)
-    return out
+    niches = frozenset(s.lower() for s in (CONFIG.get("FILTER_NICHES") or []))
+    platforms = frozenset(s.lower() for s in (CONFIG.get("FILTER_PLATFORMS") or []))
+    return [
+        l for l in leads
+        if (not niches or l.niche in niches) and (not platforms or l.platform in platforms)
+    ]
 
 
 def run_agent() -> None:
@@ -405,7 +506,8 @@ def run_agent() -> None:
         print("No leads met your niche/platform filters. Adjust FILTER_* in CONFIG.")
         return
 
-    qualified = [qualify(l, city) for l in filtered]
+    qualified = qualify_all(filtered, city)
+    qualified.sort(key=operator.attrgetter("score"), reverse=True)
     export_scored_csv(qualified, os.path.join(OUTPUT_DIR, "leads_scored.csv"))
     export_outreach_pack(qualified, city, brand, offer_text)
 
@@ -419,7 +521,10 @@ def run_agent() -> None:
     print("✅ Done! Outputs:")
     print(f"  - {os.path.join(OUTPUT_DIR, 'leads_scored.csv')}")
     print(f"  - {os.path.join(OUTPUT_DIR, 'outreach_pack.txt')}")
-    print(f"  - Per-lead messages under: {OUTPUT_DIR}/<lead-name>/<platform>.txt")
+    if bool(CONFIG.get("PACK_AS_ZIP", False)):
+        print(f"  - Per-lead messages in: {os.path.join(OUTPUT_DIR, 'outreach.zip')}")
+    else:
+        print(f"  - Per-lead messages under: {OUTPUT_DIR}/<lead-name>/<platform>.txt")
     if bool(CONFIG.get("AUTO_GENERATE_LANDING", True)):
         print("  - landing.html")
 # =============================================================================
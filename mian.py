@@ -41,14 +41,18 @@ import smtplib
 import logging
 import argparse
 import sqlite3
+import threading
 import dataclasses
-from dataclasses import dataclass, asdict
-from typing import List, Optional, Dict, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Dict, Any, Tuple, Iterator, NamedTuple, Union
 from urllib.parse import urlparse
 
 try:
     import requests
     from bs4 import BeautifulSoup
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
 except Exception:
     requests = None
     BeautifulSoup = None
@@ -68,14 +72,40 @@ SMTP_USER = os.environ.get("SMTP_USER")
 SMTP_PASS = os.environ.get("SMTP_PASS")
 SMTP_FROM = os.environ.get("SMTP_FROM")  # e.g., "Your Name <you@domain.com>"
 SMTP_RATE_PER_MIN = int(os.environ.get("SMTP_RATE_PER_MIN", "20"))
+SMTP_CONCURRENCY = int(os.environ.get("SMTP_CONCURRENCY", "1"))  # parallel SMTP sessions
+EMAIL_FETCH_WORKERS = int(os.environ.get("LEADGEN_FETCH_WORKERS", "16"))
 
 ORGANIZATION_NAME = os.environ.get("ORG_NAME", "Acme Growth")
 ORGANIZATION_ADDRESS = os.environ.get("ORG_ADDR", "123 Example St, City, ST 00000")
 UNSUB_URL = os.environ.get("UNSUB_URL", "https://example.com/unsubscribe")
 
+SENDER_NAME = SMTP_FROM.split("<")[0].strip() if SMTP_FROM else ORGANIZATION_NAME
+SMTP_FROM_ADDR = email.utils.parseaddr(SMTP_FROM)[1] if SMTP_FROM else None
+
 logging.basicConfig(level=getattr(logging, LOG_LEVEL, logging.INFO), format="[%(levelname)s] %(message)s")
 logger = logging.getLogger("leadgen")
 
+# -------------- HTTP --------------
+def build_session() -> Optional["requests.Session"]:
+    # One pooled session for SerpAPI and site scrapes: keep-alive and TLS
+    # reuse across requests to the same host. Only connection setup is
+    # retried: a read timeout already cost the full timeout, and re-sending a
+    # SerpAPI query is another billed search.
+    if requests is None:
+        return None
+    session = requests.Session()
+    session.headers.update({"User-Agent": "Mozilla/5.0"})
+    adapter = HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=32,
+        max_retries=Retry(total=2, connect=2, read=0, backoff_factor=0.3),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+SESSION = build_session()
+
 # -------------- Database --------------
 SCHEMA = """
 CREATE TABLE IF NOT EXISTS leads (
@@ -108,15 +138,41 @@ CREATE TABLE IF NOT EXISTS outreach (
     message_id TEXT,
     FOREIGN KEY(lead_id) REFERENCES leads(id)
 );
+
+CREATE INDEX IF NOT EXISTS idx_leads_stage ON leads(stage);
+CREATE INDEX IF NOT EXISTS idx_outreach_status ON outreach(status);
+CREATE INDEX IF NOT EXISTS idx_outreach_lead_id ON outreach(lead_id);
 """
 
-def db() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+_conn: Optional[sqlite3.Connection] = None
 
-with db() as conn:
-    conn.executescript(SCHEMA)
+
+def db() -> sqlite3.Connection:
+    # One shared connection per process so the WAL/cache settings persist.
+    # `with db() as conn:` still scopes a transaction (commit/rollback only).
+    global _conn
+    if _conn is None:
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-65536")  # 64 MiB
+        conn.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+        _conn = conn
+    return _conn
+
+SCHEMA_VERSION = 1
+
+
+def init_db() -> None:
+    # Applies SCHEMA once per database; later runs only read user_version.
+    with db() as conn:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < SCHEMA_VERSION:
+            conn.executescript(SCHEMA)
+            conn.execute("ANALYZE")  # give the planner stats for the new indexes
+            conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
 
 # -------------- Models --------------
 @dataclass
@@ -157,44 +213,93 @@ class Lead:
             stage=row["stage"],
         )
 
+class DraftTarget(NamedTuple):
+    """The lead columns email drafting needs, without parsing extras."""
+    id: str
+    name: str
+    category: Optional[str]
+    email: Optional[str]
+    rating: Optional[float]
+
+
+def iter_drafts(stage: str) -> Iterator[DraftTarget]:
+    # Leads with an email that don't already have a pending or sent message.
+    cur = db().execute(
+        """
+        SELECT id, name, category, email, rating FROM leads l
+        WHERE stage=? AND COALESCE(email, '') != ''
+          AND NOT EXISTS (
+              SELECT 1 FROM outreach o WHERE o.lead_id = l.id AND o.status IN ('DRAFT', 'SENT')
+          )
+        """,
+        (stage,),
+    )
+    return map(DraftTarget._make, cur)
+
 # -------------- Utilities --------------
 def now() -> int:
     return int(time.time())
 
 EMAIL_REGEX = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+_EMAIL_DOMAIN_RUN = re.compile(r"[A-Za-z0-9.-]*")
+
+
+UPSERT_SQL = """
+INSERT INTO leads (id, source, name, category, rating, review_count, email, phone, website,
+                   address, city, state, country, extras, stage, created_at, updated_at)
+VALUES (:id, :source, :name, :category, :rating, :review_count, :email, :phone, :website,
+        :address, :city, :state, :country, :extras, :stage, :created_at, :updated_at)
+ON CONFLICT(id) DO UPDATE SET
+    source=excluded.source,
+    name=excluded.name,
+    category=excluded.category,
+    rating=excluded.rating,
+    review_count=excluded.review_count,
+    email=excluded.email,
+    phone=excluded.phone,
+    website=excluded.website,
+    address=excluded.address,
+    city=excluded.city,
+    state=excluded.state,
+    country=excluded.country,
+    extras=excluded.extras,
+    updated_at=excluded.updated_at
+"""
 
 
-def upsert_lead(lead: Lead) -> None:
+def upsert_leads(leads: List[Lead]) -> int:
+    if not leads:
+        return 0
+    ts = now()
+    params = [
+        {
+            "id": lead.id,
+            "source": lead.source,
+            "name": lead.name,
+            "category": lead.category,
+            "rating": lead.rating,
+            "review_count": lead.review_count,
+            "email": lead.email,
+            "phone": lead.phone,
+            "website": lead.website,
+            "address": lead.address,
+            "city": lead.city,
+            "state": lead.state,
+            "country": lead.country,
+            "extras": json.dumps(lead.extras) if lead.extras else "{}",
+            "stage": lead.stage,
+            "created_at": ts,
+            "updated_at": ts,
+        }
+        for lead in leads
+    ]
     with db() as conn:
-        conn.execute(
-            """
-            INSERT INTO leads (id, source, name, category, rating, review_count, email, phone, website,
-                               address, city, state, country, extras, stage, created_at, updated_at)
-            VALUES (:id, :source, :name, :category, :rating, :review_count, :email, :phone, :website,
-                    :address, :city, :state, :country, :extras, :stage, :created_at, :updated_at)
-            ON CONFLICT(id) DO UPDATE SET
-                source=excluded.source,
-                name=excluded.name,
-                category=excluded.category,
-                rating=excluded.rating,
-                review_count=excluded.review_count,
-                email=excluded.email,
-                phone=excluded.phone,
-                website=excluded.website,
-                address=excluded.address,
-                city=excluded.city,
-                state=excluded.state,
-                country=excluded.country,
-                extras=excluded.extras,
-                updated_at=excluded.updated_at
-            """,
-            {
-                **asdict(lead),
-                "extras": json.dumps(lead.extras or {}),
-                "created_at": now(),
-                "updated_at": now(),
-            },
-        )
+        conn.executemany(UPSERT_SQL, params)
+    return len(params)
+
+
+def upsert_lead(lead: Lead) -> None:
+    upsert_leads([lead])
 
 
 def set_stage(lead_id: str, stage: str) -> None:
@@ -202,19 +307,29 @@ def set_stage(lead_id: str, stage: str) -> None:
         conn.execute("UPDATE leads SET stage=?, updated_at=? WHERE id=?", (stage, now(), lead_id))
 
 
+EXPORT_BATCH_SIZE = 1000
+
+
 def export_csv(stage: str, out_path: str) -> int:
+    count = 0
     with db() as conn:
-        rows = conn.execute("SELECT * FROM leads WHERE stage=?", (stage,)).fetchall()
-    if not rows:
-        logger.warning("No leads found at stage %s", stage)
-        return 0
-    with open(out_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow([c for c in rows[0].keys()])
-        for r in rows:
-            writer.writerow([r[c] for c in r.keys()])
-    logger.info("Exported %d leads to %s", len(rows), out_path)
-    return len(rows)
+        cur = conn.execute("SELECT * FROM leads WHERE stage=?", (stage,))
+        try:
+            batch = cur.fetchmany(EXPORT_BATCH_SIZE)
+            if not batch:
+                logger.warning("No leads found at stage %s", stage)
+                return 0
+            with open(out_path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow([d[0] for d in cur.description])
+                while batch:
+                    writer.writerows(tuple(r) for r in batch)
+                    count += len(batch)
+                    batch = cur.fetchmany(EXPORT_BATCH_SIZE)
+        finally:
+            cur.close()
+    logger.info("Exported %d leads to %s", count, out_path)
+    return count
 
 # -------------- Sourcing --------------
 
@@ -232,15 +347,20 @@ def search_serpapi(niche: str, location: str, limit: int = 50) -> List[Lead]:
     }
     out: List[Lead] = []
     try:
-        r = requests.get(url, params=params, timeout=30)
+        r = SESSION.get(url, params=params, timeout=30)
         r.raise_for_status()
         data = r.json()
-        for item in (data.get("local_results", []) or [])[:limit]:
+        items = (data.get("local_results", []) or [])[:limit]
+        # Homepage fetches are pure network wait, so run them concurrently.
+        websites = [item.get("website") for item in items]
+        to_fetch = list(dict.fromkeys(w for w in websites if w))
+        found: Dict[str, Optional[str]] = {}
+        if to_fetch:
+            with ThreadPoolExecutor(max_workers=max(1, min(EMAIL_FETCH_WORKERS, len(to_fetch)))) as ex:
+                found = dict(zip(to_fetch, ex.map(try_extract_email_from_site, to_fetch)))
+        for item, website in zip(items, websites):
             lid = str(uuid.uuid4())
-            website = item.get("website")
-            email = None
-            if website:
-                email = try_extract_email_from_site(website)
+            email = found.get(website) if website else None
             lead = Lead(
                 id=lid,
                 source="serpapi",
@@ -263,16 +383,40 @@ def search_serpapi(niche: str, location: str, limit: int = 50) -> List[Lead]:
     return out
 
 
+SCRAPE_CHUNK_SIZE = 16384
+SCRAPE_MAX_CHARS = 200_000  # stop scanning a page after this much text
+SCRAPE_TAIL = 128  # carried between chunks so an address split across them still matches
+
+
+def search_email(text: str) -> Optional[re.Match]:
+    # Every address contains "@": skip the regex scan on text without one.
+    return EMAIL_REGEX.search(text) if "@" in text else None
+
+
 def try_extract_email_from_site(url: str) -> Optional[str]:
     if not requests or not BeautifulSoup:
         return None
     try:
-        resp = requests.get(url, timeout=15, headers={"User-Agent": "Mozilla/5.0"})
-        if resp.status_code != 200:
-            return None
-        m = EMAIL_REGEX.search(resp.text)
-        if m:
-            return m.group(0)
+        with SESSION.get(url, timeout=15, stream=True) as resp:
+            if resp.status_code != 200:
+                return None
+            resp.encoding = resp.encoding or "utf-8"
+            buf = ""
+            scanned = 0
+            for chunk in resp.iter_content(chunk_size=SCRAPE_CHUNK_SIZE, decode_unicode=True):
+                buf += chunk
+                m = search_email(buf)
+                # Only accept a match whose domain run ends inside the buffer;
+                # otherwise it may continue in the next chunk.
+                if m and _EMAIL_DOMAIN_RUN.match(buf, m.end()).end() < len(buf):
+                    return m.group(0)
+                scanned += len(chunk)
+                if scanned >= SCRAPE_MAX_CHARS:
+                    break
+                buf = buf[m.start():] if m else buf[-SCRAPE_TAIL:]
+            m = search_email(buf)
+            if m:
+                return m.group(0)
     except Exception:
         return None
     return None
@@ -297,24 +441,53 @@ def rule_based_score(lead: Lead, min_rating: float = 3.8, min_reviews: int = 5)
     return score, notes
 
 
+# SQL mirror of rule_based_score; parameters are (min_rating, min_reviews).
+SCORE_SQL = """(
+    COALESCE(rating >= ?, 0) * 2
+    + COALESCE(review_count >= ?, 0)
+    + (COALESCE(website, '') != '')
+    + (COALESCE(email, '') != '') * 2
+)"""
+
+
 def qualify_all(min_rating: float = 3.8, min_reviews: int = 5, min_score: int = 3) -> int:
-    count = 0
+    ts = now()
     with db() as conn:
-        rows = conn.execute("SELECT * FROM leads WHERE stage='NEW'").fetchall()
-    for row in rows:
-        lead = Lead.from_row(row)
-        score, _ = rule_based_score(lead, min_rating, min_reviews)
-        if score >= min_score:
-            set_stage(lead.id, "QUALIFIED")
-            count += 1
-        else:
-            set_stage(lead.id, "DISQUALIFIED")
-    logger.info("Qualified %d / %d NEW leads", count, len(rows))
+        count = conn.execute(
+            f"UPDATE leads SET stage='QUALIFIED', updated_at=? WHERE stage='NEW' AND {SCORE_SQL} >= ?",
+            (ts, min_rating, min_reviews, min_score),
+        ).rowcount
+        rejected = conn.execute(
+            "UPDATE leads SET stage='DISQUALIFIED', updated_at=? WHERE stage='NEW'", (ts,)
+        ).rowcount
+    logger.info("Qualified %d / %d NEW leads", count, count + rejected)
     return count
 
+def preview_qualification(min_rating: float = 3.8, min_reviews: int = 5, min_score: int = 3) -> int:
+    """Count NEW leads qualify_all would promote, without changing any stage."""
+    with db() as conn:
+        return conn.execute(
+            f"SELECT COUNT(*) FROM leads WHERE stage='NEW' AND {SCORE_SQL} >= ?",
+            (min_rating, min_reviews, min_score),
+        ).fetchone()[0]
+
 # -------------- Email Generation --------------
-EMAIL_TEMPLATE = """
-Subject: {subject}
+def render_email_body(
+    subject: str,
+    first_name: Optional[str],
+    observation: str,
+    value_prop: str,
+    category: Optional[str],
+    social_proof: str,
+    lead_magnet: str,
+    cta_duration: int,
+    sender_name: str,
+    org_name: str,
+    org_address: str,
+    unsub_url: str,
+) -> str:
+    # An f-string is compiled once with the module, so no per-lead template parsing.
+    return f"""Subject: {subject}
 
 Hi {first_name or 'there'},
 
@@ -328,23 +501,22 @@ Best,
 {sender_name}
 {org_name}
 {org_address}
-Unsubscribe: {unsub_url}
-""".strip()
+Unsubscribe: {unsub_url}"""
 
 
 def split_name(biz_name: str) -> Tuple[str, str]:
-    parts = biz_name.split()
-    if not parts:
-        return ("", "")
-    return (parts[0], parts[-1])
+    name = biz_name.strip()
+    first = name.partition(" ")[0]
+    last = name.rpartition(" ")[2] if " " in name else first
+    return (first, last)
 
 
-def generate_email_body(lead: Lead, offer: str, lead_magnet: str = "free audit", cta_duration: int = 15) -> Tuple[str, str]:
+def generate_email_body(lead: Union[Lead, DraftTarget], offer: str, lead_magnet: str = "free audit", cta_duration: int = 15) -> Tuple[str, str]:
     first, _ = split_name(lead.name or "")
     subject = f"Quick question about {lead.name or 'your site'}"
     observation = "your strong reviews" if (lead.rating and lead.rating >= 4.2) else "your presence in the area"
     social_proof = "20–30% increase in qualified inquiries in 60 days"
-    body = EMAIL_TEMPLATE.format(
+    body = render_email_body(
         subject=subject,
         first_name=first or None,
         observation=observation,
@@ -353,7 +525,7 @@ def generate_email_body(lead: Lead, offer: str, lead_magnet: str = "free audit",
         social_proof=social_proof,
         lead_magnet=lead_magnet,
         cta_duration=cta_duration,
-        sender_name=SMTP_FROM.split("<")[0].strip() if SMTP_FROM else ORGANIZATION_NAME,
+        sender_name=SENDER_NAME,
         org_name=ORGANIZATION_NAME,
         org_address=ORGANIZATION_ADDRESS,
         unsub_url=UNSUB_URL,
@@ -362,69 +534,174 @@ def generate_email_body(lead: Lead, offer: str, lead_magnet: str = "free audit",
 
 
 def draft_emails_for_stage(stage: str, offer: str) -> int:
-    with db() as conn:
-        rows = conn.execute("SELECT * FROM leads WHERE stage=?", (stage,)).fetchall()
-    count = 0
-    for row in rows:
-        lead = Lead.from_row(row)
-        if not lead.email:
-            continue
+    drafts = []
+    for lead in iter_drafts(stage):
         subject, body = generate_email_body(lead, offer)
+        drafts.append((str(uuid.uuid4()), lead.id, subject, body, "DRAFT", None, None))
+    if drafts:
         with db() as conn:
-            conn.execute(
-                "INSERT OR REPLACE INTO outreach (id, lead_id, subject, body, status, sent_at, message_id) VALUES (?,?,?,?,?,?,?)",
-                (str(uuid.uuid4()), lead.id, subject, body, "DRAFT", None, None),
+            conn.executemany(
+                "INSERT INTO outreach (id, lead_id, subject, body, status, sent_at, message_id) VALUES (?,?,?,?,?,?,?)",
+                drafts,
             )
-        count += 1
-    logger.info("Drafted %d emails for stage %s", count, stage)
-    return count
+    logger.info("Drafted %d emails for stage %s", len(drafts), stage)
+    return len(drafts)
 
 # -------------- SMTP Send --------------
 
-def send_email(to_addr: str, subject: str, body: str) -> Tuple[bool, Optional[str]]:
+def smtp_configured() -> bool:
     if not (SMTP_HOST and SMTP_USER and SMTP_PASS and SMTP_FROM):
         logger.error("SMTP env vars missing. Set SMTP_HOST, SMTP_USER, SMTP_PASS, SMTP_FROM.")
-        return False, None
-    msg = f"From: {SMTP_FROM}\r\nTo: {to_addr}\r\nSubject: {subject}\r\nDate: {email.utils.formatdate(localtime=True)}\r\nMIME-Version: 1.0\r\nContent-Type: text/plain; charset=utf-8\r\n\r\n{body}"
+        return False
+    return True
+
+
+def _smtp_connect() -> smtplib.SMTP:
+    server = smtplib.SMTP(SMTP_HOST, SMTP_PORT)
     try:
-        context = ssl.create_default_context()
-        with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-            server.starttls(context=context)
-            server.login(SMTP_USER, SMTP_PASS)
-            resp = server.sendmail(email.utils.parseaddr(SMTP_FROM)[1], [to_addr], msg)
-            mid = str(uuid.uuid4()) if not resp else None
-            return True, mid
-    except Exception as e:
-        logger.error("Email send failed to %s: %s", to_addr, e)
+        server.starttls(context=ssl.create_default_context())
+        server.login(SMTP_USER, SMTP_PASS)
+    except Exception:
+        server.close()
+        raise
+    return server
+
+
+def _send_on(server: smtplib.SMTP, to_addr: str, subject: str, body: str) -> Tuple[bool, Optional[str]]:
+    msg = f"From: {SMTP_FROM}\r\nTo: {to_addr}\r\nSubject: {subject}\r\nDate: {email.utils.formatdate(localtime=True)}\r\nMIME-Version: 1.0\r\nContent-Type: text/plain; charset=utf-8\r\n\r\n{body}"
+    resp = server.sendmail(SMTP_FROM_ADDR, [to_addr], msg)
+    mid = str(uuid.uuid4()) if not resp else None
+    return True, mid
+
+
+class SMTPSession:
+    """One authenticated SMTP connection reused across sends.
+
+    Connects lazily on the first send and reconnects once if the server
+    drops the session mid-run.
+    """
+
+    def __init__(self) -> None:
+        self.server: Optional[smtplib.SMTP] = None
+
+    def __enter__(self) -> "SMTPSession":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except Exception:
+                pass
+            self.server = None
+
+    def send(self, to_addr: str, subject: str, body: str) -> Tuple[bool, Optional[str]]:
+        try:
+            if self.server is None:
+                self.server = _smtp_connect()
+            try:
+                return _send_on(self.server, to_addr, subject, body)
+            except smtplib.SMTPServerDisconnected:
+                self.server = None
+                self.server = _smtp_connect()
+                return _send_on(self.server, to_addr, subject, body)
+        except Exception as e:
+            logger.error("Email send failed to %s: %s", to_addr, e)
+            return False, None
+
+
+def send_email(to_addr: str, subject: str, body: str) -> Tuple[bool, Optional[str]]:
+    if not smtp_configured():
         return False, None
+    with SMTPSession() as session:
+        return session.send(to_addr, subject, body)
+
+
+SEND_FLUSH_EVERY = 100  # status rows per UPDATE batch in send_all
+
+
+class TokenBucket:
+    """Paces callers to `rate_per_min` sends.
+
+    Slots are scheduled off the previous slot rather than off the previous
+    send finishing, so slow sends don't drag throughput below the cap.
+    """
+
+    def __init__(self, rate_per_min: int) -> None:
+        self.interval = 60.0 / max(1, rate_per_min)
+        self.next_time = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now_ = time.monotonic()
+            wait = self.next_time - now_
+            self.next_time = max(now_, self.next_time) + self.interval
+        if wait > 0:
+            time.sleep(wait)
 
 
 def send_all(dry_run: bool = True) -> int:
     with db() as conn:
         rows = conn.execute("SELECT o.id as oid, o.subject, o.body, l.email, l.id as lid FROM outreach o JOIN leads l ON o.lead_id=l.id WHERE o.status='DRAFT'").fetchall()
     sent = 0
-    interval = 60.0 / max(1, SMTP_RATE_PER_MIN)
-    last_sent = 0.0
-    for r in rows:
-        to_addr = r["email"]
-        subject = r["subject"]
-        body = r["body"]
-        if dry_run:
-            logger.info("[DRY RUN] Would send to %s — %s", to_addr, subject)
-            success, mid = True, None
-        else:
-            # rate limit
-            delta = time.time() - last_sent
-            if delta < interval:
-                time.sleep(interval - delta)
-            success, mid = send_email(to_addr, subject, body)
-            last_sent = time.time()
+    bucket = TokenBucket(SMTP_RATE_PER_MIN)
+    # smtplib connections aren't safe to share between threads: one session per worker.
+    local = threading.local()
+    sessions: List[SMTPSession] = []
+
+    def deliver(r: sqlite3.Row) -> Tuple[bool, Optional[str]]:
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = SMTPSession()
+            sessions.append(session)
+        bucket.acquire()
+        return session.send(r["email"], r["subject"], r["body"])
+
+    # Status writes are batched; a crash loses at most one unflushed batch.
+    outreach_updates: List[Tuple[str, int, Optional[str], str]] = []
+    lead_updates: List[Tuple[str, int, str]] = []
+
+    def flush() -> None:
+        if not outreach_updates:
+            return
         with db() as conn:
-            conn.execute("UPDATE outreach SET status=?, sent_at=?, message_id=? WHERE id=?", ("SENT" if success else "ERROR", now(), mid, r["oid"]))
-            if success:
-                conn.execute("UPDATE leads SET stage=?, updated_at=? WHERE id=?", ("CONTACTED", now(), r["lid"]))
-        if success:
-            sent += 1
+            conn.executemany("UPDATE outreach SET status=?, sent_at=?, message_id=? WHERE id=?", outreach_updates)
+            conn.executemany("UPDATE leads SET stage=?, updated_at=? WHERE id=?", lead_updates)
+        outreach_updates.clear()
+        lead_updates.clear()
+
+    def dry(r: sqlite3.Row) -> Tuple[bool, Optional[str]]:
+        logger.info("[DRY RUN] Would send to %s — %s", r["email"], r["subject"])
+        return True, None
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, SMTP_CONCURRENCY)) as ex:
+            if dry_run:
+                results = map(dry, rows)
+            elif not smtp_configured():
+                results = ((False, None) for _ in rows)
+            else:
+                results = ex.map(deliver, rows)
+            try:
+                for r, (success, mid) in zip(rows, results):
+                    ts = now()
+                    outreach_updates.append(("SENT" if success else "ERROR", ts, mid, r["oid"]))
+                    if success:
+                        lead_updates.append(("CONTACTED", ts, r["lid"]))
+                        sent += 1
+                    if len(outreach_updates) >= SEND_FLUSH_EVERY:
+                        flush()
+            except BaseException:
+                ex.shutdown(wait=False, cancel_futures=True)
+                raise
+    finally:
+        flush()
+        for session in sessions:
+            session.close()
     logger.info("%s %d emails", "Would send" if dry_run else "Sent", sent)
     return sent
 
@@ -437,8 +714,7 @@ def cmd_search(args: argparse.Namespace) -> None:
 
     if not leads:
         logger.warning("No leads fetched. Provide an API key (SERPAPI_KEY/YELP_API_KEY/GOOGLE_PLACES_KEY).")
-    for lead in leads:
-        upsert_lead(lead)
+    upsert_leads(leads)
     logger.info("Inserted/updated %d leads", len(leads))
 
 
@@ -493,6 +769,7 @@ def build_parser() -> argparse.ArgumentParser:
 def main():
     parser = build_parser()
     args = parser.parse_args()
+    init_db()
     args.func(args)
 
 if __name__ == "__main__":